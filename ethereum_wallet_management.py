@@ -83,7 +83,7 @@ def send_transaction(sender_private_key, recipient_address, amount_eth):
         signed_tx = w3.eth.account.sign_transaction(tx, sender_private_key)
         
         # Gửi giao dịch đã ký
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
         
         print(f"\n--- Gửi giao dịch ---")
         print(f"Từ: {sender_address}")
@@ -6,14 +6,19 @@ Script để tương tác với các smart contract trên mạng Ethereum.
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
 import web3
 from eth_account import Account
+from revert_reason import is_revert_error, extract_revert_reason
 
 # Kết nối đến mạng thử nghiệm Sepolia thay vì mainnet
 INFURA_URL = "https://sepolia.infura.io/v3/{URL_INFURA_YOUR_API_KEY}"
 w3 = Web3(Web3.HTTPProvider(INFURA_URL))
 
+# Hệ số an toàn cộng thêm vào lượng gas ước tính
+GAS_MARGIN = 1.2
+
 # Sử dụng middleware cho mạng PoA như Sepolia
 try:
     from web3.middleware.geth import geth_poa_middleware
@@ -59,6 +64,59 @@ def call_contract_function(contract, function_name, *args):
         print(f"Lỗi khi gọi hàm {function_name}: {e}")
         return None
 
+def simulate_transaction(transaction, block_identifier='pending'):
+    """Mô phỏng một giao dịch bằng eth_call và eth_estimateGas trước khi gửi
+    
+    Chỉ lỗi revert mới được trả về dưới dạng kết quả thất bại; lỗi kết nối
+    hoặc lỗi node khác được ném ra như bình thường.
+    """
+    # Bỏ các trường chỉ dùng khi ký và gas tối đa đặt sẵn, để giao dịch cần
+    # nhiều gas hơn mức đó không bị báo nhầm là revert do hết gas
+    call_tx = {k: v for k, v in transaction.items() if k not in ('nonce', 'chainId', 'gas')}
+    
+    try:
+        w3.eth.call(call_tx, block_identifier)
+        gas = w3.eth.estimate_gas(call_tx, block_identifier)
+        
+        return {"success": True, "gas": gas, "revert_reason": None, "error": None}
+    except Exception as e:
+        if not is_revert_error(e):
+            raise
+        return {"success": False, "gas": None, "revert_reason": extract_revert_reason(e), "error": None}
+
+def simulate_transactions(transactions, block_identifier='pending', max_workers=8):
+    """Mô phỏng đồng thời nhiều giao dịch, kết quả giữ nguyên thứ tự đầu vào
+    
+    Mỗi giao dịch được mô phỏng độc lập trên trạng thái của block pending, nên
+    tác động của các giao dịch lên nhau (ví dụ approve rồi transferFrom, hoặc
+    nhiều transfer cộng lại vượt quá số dư) không được tính đến. Lỗi không
+    phải revert được ghi vào trường "error" thay vì dừng cả lô.
+    """
+    if not transactions:
+        return []
+    
+    def simulate(transaction):
+        try:
+            return simulate_transaction(transaction, block_identifier)
+        except Exception as e:
+            return {"success": False, "gas": None, "revert_reason": None, "error": str(e)}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(simulate, transactions))
+
+def apply_preflight(transaction, label):
+    """Mô phỏng giao dịch trước khi gửi và đặt gas theo lượng gas ước tính
+    
+    Nếu giao dịch sẽ bị revert thì in lý do và giữ nguyên giao dịch.
+    """
+    simulation = simulate_transaction(transaction)
+    if not simulation["success"]:
+        print(f"\n{label} sẽ bị revert: {simulation['revert_reason']}")
+        return simulation
+    
+    transaction['gas'] = int(simulation["gas"] * GAS_MARGIN)
+    return simulation
+
 def send_contract_transaction(contract, private_key, function_name, *args):
     """Gửi giao dịch đến một hàm của smart contract"""
     try:
@@ -78,11 +136,15 @@ def send_contract_transaction(contract, private_key, function_name, *args):
             'chainId': w3.eth.chain_id
         })
         
+        # Mô phỏng trước khi gửi để không mất gas cho giao dịch sẽ bị revert
+        if not apply_preflight(transaction, f"Giao dịch đến hàm {function_name}")["success"]:
+            return None
+        
         # Ký giao dịch
         signed_tx = w3.eth.account.sign_transaction(transaction, private_key)
         
         # Gửi giao dịch đã ký
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
         
         print(f"\n--- Gửi giao dịch đến hàm {function_name} ---")
         print(f"Tham số: {args}")
@@ -94,6 +156,85 @@ def send_contract_transaction(contract, private_key, function_name, *args):
         print(f"Lỗi khi gửi giao dịch đến hàm {function_name}: {e}")
         return None
 
+def send_contract_transactions(contract, private_key, calls, max_workers=8):
+    """Gửi hàng loạt giao dịch đến smart contract sau khi mô phỏng trước
+    
+    `calls` là danh sách các cặp (function_name, args). Tất cả giao dịch được
+    mô phỏng đồng thời để loại nhanh các giao dịch bị revert, sau đó mỗi giao
+    dịch còn lại được mô phỏng lại ngay trước khi gửi, trên block pending đã
+    chứa các giao dịch vừa gửi. Giao dịch bị revert hoặc gửi lỗi bị bỏ qua,
+    các giao dịch còn lại được gán nonce liên tiếp theo thứ tự ban đầu (không
+    sắp xếp lại).
+    
+    Lần mô phỏng lại chỉ chính xác khi node đưa các giao dịch vừa gửi vào
+    block pending; nếu không, giao dịch vẫn có thể revert trên chain.
+    """
+    try:
+        # Lấy thông tin tài khoản từ private key
+        account = Account.from_key(private_key)
+        sender_address = account.address
+        
+        gas_price = w3.eth.gas_price
+        chain_id = w3.eth.chain_id
+        
+        # Xây dựng các giao dịch, nonce sẽ được gán sau khi mô phỏng
+        transactions = []
+        for function_name, args in calls:
+            contract_function = getattr(contract.functions, function_name)
+            transactions.append(contract_function(*args).build_transaction({
+                'from': sender_address,
+                'gas': 2000000,
+                'gasPrice': gas_price,
+                'chainId': chain_id
+            }))
+        
+        simulations = simulate_transactions(transactions, max_workers=max_workers)
+        nonce = w3.eth.get_transaction_count(sender_address, 'pending')
+    except Exception as e:
+        print(f"Lỗi khi chuẩn bị hàng loạt giao dịch: {e}")
+        return []
+    
+    print(f"\n--- Kiểm tra trước {len(calls)} giao dịch ---")
+    print("Lưu ý: mỗi giao dịch được mô phỏng riêng lẻ, giao dịch phụ thuộc vào nhau vẫn có thể revert trên chain.")
+    
+    results = []
+    for (function_name, args), transaction, simulation in zip(calls, transactions, simulations):
+        result = {
+            "function": function_name,
+            "args": args,
+            "tx_hash": None,
+            "revert_reason": simulation["revert_reason"],
+            "error": simulation["error"]
+        }
+        results.append(result)
+        
+        if not simulation["success"]:
+            print(f"Bỏ qua {function_name}{tuple(args)}: {simulation['revert_reason'] or simulation['error']}")
+            continue
+        
+        try:
+            # Mô phỏng lại trên trạng thái đã có các giao dịch vừa gửi
+            simulation = apply_preflight(transaction, f"{function_name}{tuple(args)}")
+            if not simulation["success"]:
+                result["revert_reason"] = simulation["revert_reason"]
+                continue
+            
+            transaction['nonce'] = nonce
+            
+            # Ký và gửi giao dịch
+            signed_tx = w3.eth.account.sign_transaction(transaction, private_key)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            result["error"] = str(e)
+            print(f"Lỗi khi gửi {function_name}{tuple(args)}: {e}")
+            continue
+        
+        nonce += 1
+        result["tx_hash"] = tx_hash.hex()
+        print(f"Đã gửi {function_name}{tuple(args)}: {tx_hash.hex()}")
+    
+    return results
+
 def get_contract_events(contract, event_name, from_block=0, to_block='latest'):
     """Lấy các sự kiện từ smart contract"""
     try:
@@ -137,11 +278,15 @@ def deploy_contract(private_key, contract_bytecode, contract_abi, *constructor_a
             'chainId': w3.eth.chain_id
         })
         
+        # Mô phỏng trước khi triển khai để phát hiện constructor bị revert
+        if not apply_preflight(transaction, "Triển khai contract")["success"]:
+            return None
+        
         # Ký giao dịch
         signed_tx = w3.eth.account.sign_transaction(transaction, private_key)
         
         # Gửi giao dịch đã ký
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
         print(f"\n--- Triển khai smart contract ---")
         print(f"Từ: {sender_address}")
         print(f"Hash giao dịch: {tx_hash.hex()}")
@@ -419,6 +564,9 @@ def main():
     print("4. Gửi giao dịch (cần private key và ETH trong tài khoản):")
     print("   tx_hash = send_contract_transaction(contract, private_key, 'transfer', recipient_address, amount)")
     
+    print("5. Gửi hàng loạt giao dịch (mô phỏng trước, bỏ qua giao dịch sẽ bị revert):")
+    print("   results = send_contract_transactions(contract, private_key, [('transfer', (recipient_address, amount)), ...])")
+    
     print("\nLưu ý: Để thực hiện ví dụ trên, bạn cần thay thế địa chỉ contract, private key và các tham số khác bằng giá trị thực.")
     
     print("\n--- Menu ---")
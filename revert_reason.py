@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Giải mã lý do revert
+--------------------
+Các hàm giải mã lý do revert từ lỗi mà node Ethereum trả về khi mô phỏng
+giao dịch bằng eth_call/eth_estimateGas.
+"""
+
+import string
+from web3.exceptions import ContractLogicError
+from eth_abi import decode
+
+# Selector của Error(string) và Panic(uint256) trong dữ liệu revert
+ERROR_SELECTOR = "08c379a0"
+PANIC_SELECTOR = "4e487b71"
+PANIC_CODES = {
+    0x01: "assert thất bại",
+    0x11: "tràn số (overflow/underflow)",
+    0x12: "chia cho 0",
+    0x21: "giá trị enum không hợp lệ",
+    0x31: "pop() trên mảng rỗng",
+    0x32: "truy cập mảng ngoài phạm vi",
+    0x41: "cấp phát quá nhiều bộ nhớ",
+    0x51: "gọi hàm nội bộ không hợp lệ"
+}
+
+# Tiền tố web3 thêm vào thông điệp gốc của node khi "data" là dict
+REVERT_MESSAGE_PREFIX = "execution reverted: "
+
+def decode_revert_reason(revert_data):
+    """Giải mã lý do revert từ dữ liệu trả về của eth_call"""
+    if not isinstance(revert_data, str) or not revert_data:
+        return None
+
+    data = revert_data[2:] if revert_data.startswith("0x") else revert_data
+    if not data:
+        return None
+
+    try:
+        selector, payload = data[:8], bytes.fromhex(data[8:])
+
+        if selector == ERROR_SELECTOR:
+            return decode(["string"], payload)[0]
+        if selector == PANIC_SELECTOR:
+            code = decode(["uint256"], payload)[0]
+            return f"Panic 0x{code:02x}: {PANIC_CODES.get(code, 'không xác định')}"
+
+        # Custom error: trả về dạng hex
+        return f"0x{data}"
+    except Exception:
+        # Dữ liệu không phải hex hợp lệ (ví dụ "Reverted 0x..."): trả về nguyên bản
+        return revert_data
+
+def _is_revert_data(data):
+    """Kiểm tra trường "data" của lỗi node có chứa dữ liệu revert hay không"""
+    if isinstance(data, str):
+        if data.startswith("Reverted "):
+            return True
+        return data.startswith("0x") and all(c in string.hexdigits for c in data[2:])
+
+    # Ganache: {tx_hash: {"error": "revert", "reason": ...}}
+    if isinstance(data, dict):
+        return any(isinstance(v, dict) and ("error" in v or "reason" in v) for v in data.values())
+
+    return False
+
+def is_revert_error(error):
+    """Kiểm tra exception có phải do giao dịch bị revert hay không
+
+    web3 cũng ném ContractLogicError cho lỗi node không phải revert (ví dụ
+    Infura giới hạn request, "header not found"), nên chỉ coi là revert khi
+    có dữ liệu revert hoặc thông điệp gốc của node nhắc đến revert.
+    """
+    if isinstance(error, ContractLogicError):
+        if _is_revert_data(error.data):
+            return True
+
+        message = error.message or ""
+        if isinstance(error.data, dict) and message.startswith(REVERT_MESSAGE_PREFIX):
+            message = message[len(REVERT_MESSAGE_PREFIX):]
+        return "revert" in message.lower()
+
+    # Một số node trả về ValueError chứa dict {'code', 'message', 'data'}
+    if isinstance(error, ValueError) and error.args and isinstance(error.args[0], dict):
+        rpc_error = error.args[0]
+        message = str(rpc_error.get("message", "")).lower()
+        return _is_revert_data(rpc_error.get("data")) or "revert" in message
+
+    return False
+
+def extract_revert_reason(error):
+    """Lấy lý do revert từ exception do node trả về"""
+    if isinstance(error, ContractLogicError):
+        return decode_revert_reason(error.data) or error.message
+
+    if error.args and isinstance(error.args[0], dict):
+        rpc_error = error.args[0]
+        return decode_revert_reason(rpc_error.get("data")) or rpc_error.get("message")
+
+    return str(error)
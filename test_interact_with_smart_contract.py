@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Kiểm thử mô phỏng và gửi hàng loạt giao dịch trong interact_with_smart_contract.py.
+"""
+
+import importlib
+import time
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+from web3.eth import Eth
+from web3.exceptions import ContractLogicError
+
+PRIVATE_KEY = "0x" + "11" * 32
+
+@pytest.fixture
+def m(monkeypatch):
+    """Import module mà không cần kết nối đến node"""
+    monkeypatch.setattr(Web3, "is_connected", lambda self: True)
+    monkeypatch.setattr(Eth, "chain_id", 11155111)
+    return importlib.import_module("interact_with_smart_contract")
+
+class FakeEth:
+    """Giả lập w3.eth: các hàm có tên trong `reverts` bị revert khi mô phỏng,
+    các hàm trong `errors` gặp lỗi kết nối, các hàm trong `send_failures` lỗi khi gửi"""
+
+    def __init__(self, reverts=(), errors=(), send_failures=(), pending_nonce=7):
+        self.reverts = set(reverts)
+        self.errors = set(errors)
+        self.send_failures = set(send_failures)
+        self.pending_nonce = pending_nonce
+        self.gas_price = 1
+        self.chain_id = 11155111
+        self.sent = []
+        self.call_gas = []
+        self.account = SimpleNamespace(
+            sign_transaction=lambda tx, key: SimpleNamespace(rawTransaction=dict(tx))
+        )
+
+    def _simulate(self, tx):
+        self.call_gas.append(tx.get('gas'))
+        if tx['data'] in self.reverts:
+            raise ContractLogicError("execution reverted: paused", data="0x")
+        if tx['data'] in self.errors:
+            raise ConnectionError("connection reset")
+
+    def call(self, tx, block_identifier):
+        self._simulate(tx)
+        return b""
+
+    def estimate_gas(self, tx, block_identifier):
+        self._simulate(tx)
+        return 50000
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        return self.pending_nonce if block_identifier == 'pending' else 0
+
+    def send_raw_transaction(self, raw):
+        if raw['data'] in self.send_failures:
+            raise ValueError({"code": -32000, "message": "insufficient funds for gas * price + value"})
+        self.sent.append(raw)
+        return bytes.fromhex(f"{len(self.sent):064x}")
+
+def fake_contract(names):
+    """Contract giả: mỗi hàm tạo giao dịch có trường data là tên hàm"""
+    def function(name):
+        def build(*args):
+            return SimpleNamespace(build_transaction=lambda params: {**params, 'data': name})
+        return build
+    return SimpleNamespace(functions=SimpleNamespace(**{name: function(name) for name in names}))
+
+def send(m, monkeypatch, eth, names):
+    monkeypatch.setattr(m.w3, "eth", eth)
+    return m.send_contract_transactions(fake_contract(names), PRIVATE_KEY, [(name, ()) for name in names])
+
+def test_reverting_calls_are_dropped(m, monkeypatch):
+    eth = FakeEth(reverts={"b"})
+    results = send(m, monkeypatch, eth, ["a", "b", "c"])
+
+    assert [tx['data'] for tx in eth.sent] == ["a", "c"]
+    assert results[1]["tx_hash"] is None
+    assert results[1]["revert_reason"] == "execution reverted: paused"
+    assert results[1]["error"] is None
+
+def test_survivors_get_consecutive_nonces_from_pending(m, monkeypatch):
+    eth = FakeEth(reverts={"b"}, pending_nonce=7)
+    send(m, monkeypatch, eth, ["a", "b", "c", "d"])
+
+    assert [tx['nonce'] for tx in eth.sent] == [7, 8, 9]
+
+def test_failed_send_does_not_consume_nonce(m, monkeypatch):
+    eth = FakeEth(send_failures={"b"})
+    results = send(m, monkeypatch, eth, ["a", "b", "c"])
+
+    assert [(tx['data'], tx['nonce']) for tx in eth.sent] == [("a", 7), ("c", 8)]
+    assert results[1]["tx_hash"] is None
+    assert "insufficient funds" in results[1]["error"]
+    assert results[2]["tx_hash"] is not None
+
+def test_non_revert_errors_do_not_abort_batch(m, monkeypatch):
+    eth = FakeEth(errors={"a"})
+    results = send(m, monkeypatch, eth, ["a", "b"])
+
+    assert results[0]["revert_reason"] is None
+    assert results[0]["error"] == "connection reset"
+    assert [tx['data'] for tx in eth.sent] == ["b"]
+
+def test_results_keep_input_order(m, monkeypatch):
+    eth = FakeEth(reverts={"c"}, errors={"a"}, send_failures={"d"})
+    names = ["a", "b", "c", "d", "e"]
+    results = send(m, monkeypatch, eth, names)
+
+    assert [r["function"] for r in results] == names
+    assert [r["tx_hash"] is not None for r in results] == [False, True, False, False, True]
+
+def test_gas_is_estimate_with_margin(m, monkeypatch):
+    eth = FakeEth()
+    send(m, monkeypatch, eth, ["a"])
+
+    assert eth.sent[0]['gas'] == int(50000 * m.GAS_MARGIN)
+    # Gas tối đa đặt sẵn không được truyền vào eth_call/eth_estimateGas
+    assert eth.call_gas and all(gas is None for gas in eth.call_gas)
+
+def test_simulate_transactions_keeps_order_when_concurrent(m, monkeypatch):
+    eth = FakeEth(reverts={"slow"})
+    original = eth.call
+
+    def call(tx, block_identifier):
+        # Giao dịch đầu tiên hoàn thành sau cùng
+        if tx['data'] == "slow":
+            time.sleep(0.05)
+        return original(tx, block_identifier)
+
+    eth.call = call
+    monkeypatch.setattr(m.w3, "eth", eth)
+    simulations = m.simulate_transactions([{'data': "slow"}, {'data': "fast"}])
+
+    assert [s["success"] for s in simulations] == [False, True]
+
+def test_simulate_transaction_raises_non_revert_errors(m, monkeypatch):
+    monkeypatch.setattr(m.w3, "eth", FakeEth(errors={"a"}))
+
+    with pytest.raises(ConnectionError):
+        m.simulate_transaction({'data': "a"})
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Kiểm thử các hàm giải mã lý do revert trong revert_reason.py.
+"""
+
+from eth_abi import encode
+from web3._utils.method_formatters import raise_contract_logic_error_on_revert
+from web3.exceptions import ContractLogicError
+
+from revert_reason import (
+    ERROR_SELECTOR,
+    PANIC_SELECTOR,
+    decode_revert_reason,
+    extract_revert_reason,
+    is_revert_error
+)
+
+def error_data(reason):
+    """Tạo dữ liệu revert dạng Error(string)"""
+    return "0x" + ERROR_SELECTOR + encode(["string"], [reason]).hex()
+
+def panic_data(code):
+    """Tạo dữ liệu revert dạng Panic(uint256)"""
+    return "0x" + PANIC_SELECTOR + encode(["uint256"], [code]).hex()
+
+def node_error(error):
+    """Tạo exception giống web3 khi node trả về lỗi cho eth_call/eth_estimateGas"""
+    try:
+        raise_contract_logic_error_on_revert({"jsonrpc": "2.0", "id": 1, "error": error})
+    except ContractLogicError as e:
+        return e
+    return ValueError(error)
+
+def test_decode_error_string():
+    assert decode_revert_reason(error_data("insufficient balance")) == "insufficient balance"
+
+def test_decode_error_string_without_prefix():
+    assert decode_revert_reason(error_data("not owner")[2:]) == "not owner"
+
+def test_decode_panic():
+    assert decode_revert_reason(panic_data(0x11)) == "Panic 0x11: tràn số (overflow/underflow)"
+
+def test_decode_unknown_panic_code():
+    assert decode_revert_reason(panic_data(0x99)) == "Panic 0x99: không xác định"
+
+def test_decode_custom_error_returns_hex():
+    assert decode_revert_reason("0xdeadbeef0001") == "0xdeadbeef0001"
+
+def test_decode_empty_data():
+    assert decode_revert_reason("0x") is None
+    assert decode_revert_reason("") is None
+    assert decode_revert_reason(None) is None
+
+def test_decode_non_string_data():
+    assert decode_revert_reason({"message": "revert"}) is None
+
+def test_decode_non_hex_returns_raw():
+    assert decode_revert_reason("Reverted 0x1234") == "Reverted 0x1234"
+
+def test_decode_odd_length_hex_returns_raw():
+    assert decode_revert_reason("0x08c379a0123") == "0x08c379a0123"
+
+def test_decode_truncated_error_payload_returns_raw():
+    data = error_data("truncated")[:80]
+    assert decode_revert_reason(data) == data
+
+def test_extract_from_contract_logic_error_with_data():
+    error = ContractLogicError("execution reverted", data=error_data("paused"))
+    assert extract_revert_reason(error) == "paused"
+
+def test_extract_from_contract_logic_error_without_data():
+    error = ContractLogicError("execution reverted: paused")
+    assert extract_revert_reason(error) == "execution reverted: paused"
+
+def test_extract_from_contract_logic_error_with_dict_data():
+    error = ContractLogicError("execution reverted: paused", data={"0xabc": {"error": "revert"}})
+    assert extract_revert_reason(error) == "execution reverted: paused"
+
+def test_extract_from_rpc_error_dict():
+    error = ValueError({"code": 3, "message": "execution reverted", "data": panic_data(0x12)})
+    assert extract_revert_reason(error) == "Panic 0x12: chia cho 0"
+
+def test_extract_from_rpc_error_dict_without_data():
+    error = ValueError({"code": -32000, "message": "execution reverted"})
+    assert extract_revert_reason(error) == "execution reverted"
+
+def test_extract_from_other_error():
+    assert extract_revert_reason(ValueError("boom")) == "boom"
+
+def test_is_revert_error():
+    assert is_revert_error(ContractLogicError("execution reverted"))
+    assert is_revert_error(ValueError({"code": 3, "message": "execution reverted", "data": "0x"}))
+    assert is_revert_error(ValueError({"code": -32000, "message": "execution reverted"}))
+
+def test_is_revert_error_for_node_reverts():
+    # Geth: revert có lý do
+    assert is_revert_error(node_error({"code": 3, "message": "execution reverted: paused", "data": error_data("paused")}))
+    # Geth: revert không có dữ liệu
+    assert is_revert_error(node_error({"code": -32000, "message": "execution reverted", "data": None}))
+    # Custom error và Panic
+    assert is_revert_error(node_error({"code": 3, "message": "execution reverted", "data": "0xdeadbeef0001"}))
+    assert is_revert_error(node_error({"code": 3, "message": "execution reverted", "data": panic_data(0x11)}))
+    # Parity/OpenEthereum
+    assert is_revert_error(node_error({"code": -32015, "message": "VM execution error.", "data": "Reverted 0x"}))
+    # Ganache
+    assert is_revert_error(node_error({
+        "code": -32000,
+        "message": "VM Exception while processing transaction: revert paused",
+        "data": {"0xabc": {"error": "revert", "reason": "paused"}}
+    }))
+
+def test_is_not_revert_error():
+    assert not is_revert_error(ConnectionError("connection refused"))
+    assert not is_revert_error(TimeoutError())
+    assert not is_revert_error(ValueError("boom"))
+
+def test_is_not_revert_error_for_infura_rate_limit():
+    error = node_error({
+        "code": -32005,
+        "message": "daily request count exceeded, request rate limited",
+        "data": {"rate": {"allowed_rps": 1, "backoff_seconds": 30, "current_rps": 13.2}, "see": "https://infura.io/dashboard"}
+    })
+    assert isinstance(error, ContractLogicError)
+    assert not is_revert_error(error)
+
+def test_is_not_revert_error_for_null_data():
+    error = node_error({"code": -32000, "message": "header not found", "data": None})
+    assert isinstance(error, ContractLogicError)
+    assert not is_revert_error(error)